@@ -1,5 +1,9 @@
 
 # async_message.py
+import heapq
+import itertools
+import threading
+
 from PySide6.QtCore import QObject, Signal, QThread, QTimer
 
 
@@ -13,7 +17,9 @@ class AsyncMessageHandler(QObject):
         super().__init__(parent)
         self.thread = QThread()
         self.moveToThread(self.thread)
-        self.queue = []  # 元素为 (source, data)
+        self.queue = []  # 最小堆，元素为 (priority, order, source, data)
+        self._order = itertools.count()
+        self._lock = threading.Lock()
         self.timer = QTimer()
         self.timer.setInterval(10)
         self.timer.timeout.connect(self._process_queue)
@@ -27,12 +33,17 @@ class AsyncMessageHandler(QObject):
         self.thread.quit()
         self.thread.wait()
 
-    def handle_message(self, source, data):
-        self.queue.append((source, data))
+    def handle_message(self, source, data, priority: int = 0):
+        """消息入队，priority 数值越小越先处理，同优先级保持先进先出"""
+        with self._lock:
+            heapq.heappush(self.queue, (priority, next(self._order), source, data))
 
     def _process_queue(self):
-        while self.queue:
-            source, data = self.queue.pop(0)
+        while True:
+            with self._lock:
+                if not self.queue:
+                    break
+                _, _, source, data = heapq.heappop(self.queue)
             # 实际处理逻辑可自定义
             # print(f"[AsyncHandler] {source} -> {data}")
             self.message_handled.emit(source, data)
\ No newline at end of file
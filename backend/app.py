@@ -1,12 +1,23 @@
 import threading
 from random import random
 
-from flask import Flask, jsonify, send_from_directory
+from flask import Flask, Response, jsonify, request, send_from_directory
 # from flask_cors import CORS
 
+from backend.push import event_stream, hub
+from backend.responses import (
+    FastJSONProvider, columnar_response, json_array_response, ndjson_response, page_args, paginate,
+)
+
 app = Flask(__name__, static_folder="web")
+app.json = FastJSONProvider(app)  # orjson 已安装时使用 orjson
 # CORS(app)  # 允许跨域
 
+USERS = [
+    {"id": 0, "name": 'Umi', "nickName": 'U', "gender": 'MALE'},
+    {"id": 1, "name": 'Fish', "nickName": 'B', "gender": 'FEMALE'},
+]
+
 
 @app.route("/")
 def index():
@@ -22,13 +33,69 @@ def xunhuan():
     while True:
         print(random())
 
+@app.route("/api/health")
+def health():
+    """健康检查，BackendServer 据此判断服务已就绪"""
+    return jsonify({"status": "ok"})
+
+
 @app.route("/api/hello")
 def hello():
     # threading.Thread(target=xunhuan, daemon=True).start()
-    return jsonify({"message": "Hello from Flask!", "list": [
-        {"id": 0, "name": 'Umi', "nickName": 'U', "gender": 'MALE'},
-        {"id": 1, "name": 'Fish', "nickName": 'B', "gender": 'FEMALE'},
-    ]})
+    return jsonify({"message": "Hello from Flask!", "list": USERS})
+
+
+@app.route("/api/users")
+def users():
+    """
+    大表接口示例
+    ?format=ndjson  流式 NDJSON
+    ?format=stream  流式 JSON（与 /api/hello 结构相同）
+    默认按 ?cursor=&limit= 游标分页
+    """
+    fmt = request.args.get("format")
+    if fmt == "ndjson":
+        return ndjson_response(USERS)
+    if fmt == "stream":
+        return json_array_response(USERS, envelope={"message": "Hello from Flask!"})
+
+    try:
+        after, limit = page_args(cursor_type=int)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(paginate(
+        lambda after_id, n: [u for u in USERS if after_id is None or u["id"] > after_id][:n],
+        lambda u: u["id"],
+        after,
+        limit,
+    ))
+
+
+@app.route("/api/events")
+def events():
+    """
+    Server-Sent Events 推送：TcpServer 收到的数据经 backend.push.hub 转发到页面
+    前端使用 new EventSource('/api/events')，监听 data / async_data 事件
+    注意每个打开的页面会占用一个 waitress 工作线程
+    hub 是进程内对象：gunicorn worker 中没有事件源，返回 503；服务停止中（hub 已关闭）同样返回 503
+    """
+    if not hub.sources:
+        return jsonify({"error": "no event source in this process; SSE requires the waitress engine"}), 503
+    if hub.closed:
+        return jsonify({"error": "server is shutting down"}), 503
+    return Response(event_stream(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+
+
+@app.route("/api/columnar/<int:blob_id>")
+def columnar(blob_id):
+    """/api/events 中 ColumnarTable 事件对应的二进制负载"""
+    data = hub.get_blob(blob_id)
+    if data is None:
+        return jsonify({"error": "expired"}), 404
+    return columnar_response(data)
 
 
 # if __name__ == '__main__':
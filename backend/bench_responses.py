@@ -0,0 +1,84 @@
+"""
+大响应基准：1M 行表格，比较首字节时间（TTFB）、总耗时与峰值内存。
+
+  jsonify-stdlib   Flask 默认 provider，先物化整个列表
+  jsonify-fast     FastJSONProvider（orjson 已安装时），先物化整个列表
+  stream-json      json_array_response，生成器逐块输出
+  stream-ndjson    ndjson_response，生成器逐块输出
+
+用法：python -m backend.bench_responses [--rows 1000000]
+"""
+import argparse
+import time
+import tracemalloc
+
+from flask import Flask, jsonify
+
+from backend.responses import FastJSONProvider, json_array_response, ndjson_response, orjson
+
+
+def generate_rows(n: int):
+    for i in range(n):
+        yield {"id": i, "name": f"user{i}", "nickName": "U", "gender": "MALE" if i % 2 else "FEMALE", "score": i * 0.5}
+
+
+def create_app(rows: int, fast: bool) -> Flask:
+    app = Flask(__name__)
+    if fast:
+        app.json = FastJSONProvider(app)
+
+    @app.route("/materialized")
+    def materialized():
+        return jsonify({"message": "ok", "list": list(generate_rows(rows))})
+
+    @app.route("/stream-json")
+    def stream_json():
+        return json_array_response(generate_rows(rows), envelope={"message": "ok"})
+
+    @app.route("/stream-ndjson")
+    def stream_ndjson():
+        return ndjson_response(generate_rows(rows))
+
+    return app
+
+
+def measure(app: Flask, path: str):
+    client = app.test_client()
+    tracemalloc.start()
+    start = time.perf_counter()
+    response = client.get(path, buffered=False)
+    chunks = iter(response.response)
+    size = len(next(chunks))
+    ttfb = time.perf_counter() - start
+    for chunk in chunks:
+        size += len(chunk)
+    total = time.perf_counter() - start
+    response.close()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return ttfb, total, peak, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    stdlib_app = create_app(args.rows, fast=False)
+    fast_app = create_app(args.rows, fast=True)
+    cases = [
+        ("jsonify-stdlib", stdlib_app, "/materialized"),
+        ("jsonify-fast", fast_app, "/materialized"),
+        ("stream-json", fast_app, "/stream-json"),
+        ("stream-ndjson", fast_app, "/stream-ndjson"),
+    ]
+
+    print(f"rows: {args.rows}  encoder: {'orjson' if orjson is not None else 'stdlib json'}")
+    print(f"{'case':<16}{'TTFB ms':>10}{'total ms':>10}{'peak MiB':>10}{'size MiB':>10}")
+    for name, app, path in cases:
+        ttfb, total, peak, size = measure(app, path)
+        print(f"{name:<16}{ttfb * 1e3:>10.1f}{total * 1e3:>10.1f}{peak / 2 ** 20:>10.1f}{size / 2 ** 20:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+本机负载测试：依次以不同引擎/参数启动 BackendServer，对静态首页和 /api/hello 施压，
+输出每种配置的 req/s 与延迟分位数。
+
+用法：python -m backend.bench_server [--duration 5] [--concurrency 16]
+gunicorn 仅支持 macOS / Linux；gevent 引擎需要安装 gevent。
+"""
+import argparse
+import http.client
+import threading
+import time
+
+from backend.server import BackendServer, ServerConfig
+
+CASES = [
+    ("waitress t=4", dict(engine="waitress", threads=4)),
+    ("waitress t=16", dict(engine="waitress", threads=16)),
+    ("gunicorn sync w=4", dict(engine="gunicorn", worker_class="sync", workers=4)),
+    ("gunicorn gthread w=2 t=8", dict(engine="gunicorn", worker_class="gthread", workers=2, threads=8)),
+    ("gunicorn gevent w=2", dict(engine="gunicorn", worker_class="gevent", workers=2)),
+]
+ROUTES = ["/", "/api/hello"]
+
+
+def load(host: str, port: int, path: str, duration: float, concurrency: int):
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        # http.client 在服务端关闭连接（如 sync worker）后会自动重连
+        conn = http.client.HTTPConnection(host, port, timeout=10)
+        local = []
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                conn.request("GET", path)
+                response = conn.getresponse()
+                response.read()
+                if response.status != 200:
+                    raise http.client.HTTPException(response.status)
+                local.append(time.perf_counter() - start)
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                with lock:
+                    errors[0] += 1
+        conn.close()
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    latencies.sort()
+    return latencies, errors[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--port", type=int, default=5100)
+    args = parser.parse_args()
+
+    print(f"{'engine':<26}{'route':<12}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for i, (name, options) in enumerate(CASES):
+        server = BackendServer(ServerConfig(port=args.port + i, **options))
+        server.start()
+        try:
+            if not server.wait_ready():
+                print(f"{name:<26}failed to start")
+                continue
+            for path in ROUTES:
+                latencies, errors = load("127.0.0.1", server.config.port, path, args.duration, args.concurrency)
+                n = len(latencies)
+                if not n:
+                    print(f"{name:<26}{path:<12}{'-':>10}{'-':>10}{'-':>10}{errors:>8}")
+                    continue
+                print(f"{name:<26}{path:<12}{n / args.duration:>10.0f}"
+                      f"{latencies[n // 2] * 1e3:>10.2f}{latencies[int(n * 0.99)] * 1e3:>10.2f}{errors:>8}")
+        finally:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
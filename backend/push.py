@@ -0,0 +1,201 @@
+import itertools
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from backend.responses import dumps
+from columnar import ColumnarTable
+
+
+class Subscription:
+    """
+    单个订阅者的有界队列
+
+    队列满时丢弃最旧的事件；带 key 的事件在被取走前会被同 key 的新事件覆盖（只保留最新值）
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.queue = deque()  # 元素为 [key, frame]
+        self.pending: Dict[Hashable, list] = {}  # key -> 队列中的元素，用于合并
+        self.dropped = 0
+        self.closed = False
+        self.cond = threading.Condition()
+
+    def put(self, frame: bytes, key: Optional[Hashable] = None):
+        with self.cond:
+            if self.closed:
+                return
+            entry = self.pending.get(key) if key is not None else None
+            if entry is not None:
+                entry[1] = frame
+                return
+
+            if len(self.queue) >= self.maxsize:
+                old_key, _ = self.queue.popleft()
+                if old_key is not None:
+                    self.pending.pop(old_key, None)
+                self.dropped += 1
+
+            entry = [key, frame]
+            self.queue.append(entry)
+            if key is not None:
+                self.pending[key] = entry
+            self.cond.notify()
+
+    def get(self, timeout: Optional[float] = None) -> List[bytes]:
+        """取走当前全部事件，队列为空时最多等待 timeout 秒，close() 会立即唤醒"""
+        with self.cond:
+            if not self.queue and not self.closed:
+                self.cond.wait(timeout)
+            frames = [frame for _, frame in self.queue]
+            self.queue.clear()
+            self.pending.clear()
+            return frames
+
+    def close(self):
+        """结束订阅，唤醒正在等待的 get()"""
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+
+class PushHub:
+    """
+    线程安全的事件分发中心：Qt 线程发布，SSE 响应线程订阅
+
+    事件在发布时只序列化一次，所有订阅者共享同一份字节
+    """
+
+    def __init__(self, maxsize: int = 256, max_blobs: int = 32):
+        self.maxsize = maxsize
+        self.max_blobs = max_blobs
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self.closed = False
+        self.sources = 0  # 已桥接的事件源数量，见 bridge_tcp_server
+        # 二进制负载（SSE 只能传文本，事件中只携带下载地址）
+        self._blobs = OrderedDict()
+        self._blob_ids = itertools.count(1)
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(self.maxsize)
+        with self._lock:
+            if self.closed:
+                subscription.close()
+            else:
+                self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, event: str, data: Any, key: Optional[Hashable] = None):
+        """
+        发布事件
+
+        Args:
+            event: SSE 事件名
+            data: 可 JSON 序列化的数据
+            key: 合并键，订阅者来不及消费时同 key 只保留最新一条；None 表示不合并
+        """
+        with self._lock:
+            subscribers = list(self._subscribers)
+        if not subscribers:
+            return
+        frame = f"event: {event}\ndata: ".encode('utf-8') + dumps(data) + b"\n\n"
+        for subscription in subscribers:
+            subscription.put(frame, key)
+
+    def close(self):
+        """关闭所有订阅，SSE 响应随之结束；服务停止前调用，避免工作线程阻塞在等待中"""
+        with self._lock:
+            self.closed = True
+            subscribers = list(self._subscribers)
+            self._subscribers.clear()
+        for subscription in subscribers:
+            subscription.close()
+
+    def reopen(self):
+        """close() 之后重新接受订阅；服务重新启动时调用"""
+        with self._lock:
+            self.closed = False
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def put_blob(self, data) -> int:
+        """保存二进制负载（bytes 或 memoryview），只保留最近 max_blobs 个，返回编号"""
+        with self._lock:
+            blob_id = next(self._blob_ids)
+            self._blobs[blob_id] = data
+            while len(self._blobs) > self.max_blobs:
+                self._blobs.popitem(last=False)
+        return blob_id
+
+    def get_blob(self, blob_id: int) -> Optional[bytes]:
+        with self._lock:
+            return self._blobs.get(blob_id)
+
+
+hub = PushHub()
+
+
+def bridge_tcp_server(server, push_hub: PushHub = hub,
+                      topic: Optional[Callable[[Any], Optional[Hashable]]] = None):
+    """
+    将 TcpServer 的 data_received / async_data_received 转发到 PushHub
+
+    hub 是进程内对象，只有与 TcpServer 同进程的 Flask（waitress 引擎）能收到事件；
+    gunicorn worker 是独立进程，其 /api/events 会返回 503。
+
+    ColumnarTable 负载以二进制保存在 hub 中，事件只携带 {"columnar": 下载地址, "rows": 行数}，
+    页面按地址取 ArrayBuffer；收到的表格直接保存接收时的负载，不重新打包，
+    同一条消息的 data 与 async_data 事件共用一份二进制。
+    没有订阅者时不做任何序列化
+
+    Args:
+        server: TcpServer 实例
+        push_hub: 目标分发中心
+        topic: topic(data) 返回消息主题，订阅者积压时同一客户端同一主题只保留最新一条；
+            返回 None 或未提供时不合并
+    """
+    push_hub.sources += 1
+    last_blob = [None, None]  # [最近打包的 ColumnarTable, 编号]，异步处理结果是同一对象
+
+    def forward(event: str):
+        def slot(client, data):
+            if not push_hub.subscriber_count():
+                return
+            key = topic(data) if topic is not None else None
+            if key is not None:
+                key = (event, server.connection_ids.get(client), key)
+            if isinstance(data, ColumnarTable):
+                if last_blob[0] is not data:
+                    blob = data.buffer if data.buffer is not None else data.pack()
+                    last_blob[:] = [data, push_hub.put_blob(blob)]
+                data = {"columnar": f"/api/columnar/{last_blob[1]}", "rows": data.rows}
+            push_hub.publish(event, data, key)
+        return slot
+
+    server.data_received.connect(forward('data'))
+    server.async_data_received.connect(forward('async_data'))
+
+
+def event_stream(push_hub: PushHub = hub, keepalive: float = 15.0):
+    """SSE 响应体生成器；客户端断开时取消订阅，hub.close() 后结束"""
+    subscription = push_hub.subscribe()
+    try:
+        yield b"retry: 1000\n\n"
+        while True:
+            frames = subscription.get(timeout=keepalive)
+            if frames:
+                yield b''.join(frames)
+            if subscription.closed:
+                return
+            if not frames:
+                yield b": keepalive\n\n"
+    finally:
+        push_hub.unsubscribe(subscription)
@@ -0,0 +1,187 @@
+import base64
+import binascii
+import json
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from flask import Response, request
+from flask.json.provider import DefaultJSONProvider
+
+from columnar import ColumnarTable
+
+try:
+    import orjson
+except ImportError:  # 可选依赖，未安装时回退到标准库 json
+    orjson = None
+
+# datetime / dataclass 交给 DefaultJSONProvider.default，与标准库回退路径输出一致（日期为 HTTP 日期格式）
+ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+    if orjson is not None else 0
+)
+
+_encoder = json.JSONEncoder(
+    ensure_ascii=False, separators=(',', ':'), default=DefaultJSONProvider.default
+)
+
+
+def dumps(obj: Any) -> bytes:
+    """序列化为紧凑的 UTF-8 JSON 字节，优先使用 orjson"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=DefaultJSONProvider.default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            pass  # orjson 不支持超过 64 位的整数等，交给标准库处理
+    return _encoder.encode(obj).encode('utf-8')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider：jsonify / request.get_json 使用 orjson（已安装时），
+    不再对键排序，避免大响应的额外开销。
+    """
+
+    sort_keys = False
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return dumps(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        # 调试模式下 Flask 输出缩进格式，保持原行为
+        if orjson is None or self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        # 与 jsonify 一样以换行结尾
+        return self._app.response_class(dumps(obj) + b"\n", mimetype=self.mimetype)
+
+
+def _chunks(rows: Iterable[Any], chunk_rows: int) -> Iterable[List[Any]]:
+    it = iter(rows)
+    while True:
+        chunk = list(islice(it, chunk_rows))
+        if not chunk:
+            return
+        yield chunk
+
+
+def ndjson_response(rows: Iterable[Any], chunk_rows: int = 1000) -> Response:
+    """
+    流式返回 NDJSON（每行一个 JSON 对象）
+
+    rows 可以是生成器，数据边生成边发送，不会整体驻留内存
+    """
+    def generate():
+        for chunk in _chunks(rows, chunk_rows):
+            yield b''.join(dumps(row) + b'\n' for row in chunk)
+
+    return Response(generate(), mimetype='application/x-ndjson')
+
+
+def json_array_response(rows: Iterable[Any], envelope: Optional[Dict[str, Any]] = None, key: str = 'list',
+                        chunk_rows: int = 1000) -> Response:
+    """
+    流式返回 JSON 数组，前端仍可按普通 JSON 解析
+
+    Args:
+        rows: 行数据，可以是生成器
+        envelope: 外层对象的其余字段，给出时输出 {...envelope, key: [rows]}，否则直接输出 [rows]
+        key: 行数组在外层对象中的键
+        chunk_rows: 每次发送的行数
+    """
+    if envelope is None:
+        head, tail = b'[', b']'
+    else:
+        head = dumps(envelope)[:-1] + (b',' if envelope else b'') + dumps(key) + b':['
+        tail = b']}'
+
+    def generate():
+        yield head
+        first = True
+        for chunk in _chunks(rows, chunk_rows):
+            # 整块序列化后去掉外层方括号，每块只调用一次编码器
+            body = dumps(chunk)[1:-1]
+            yield body if first else b',' + body
+            first = False
+        yield tail
+
+    return Response(generate(), mimetype='application/json')
+
+
+COLUMNAR_MIMETYPE = 'application/vnd.psqt.columnar'
+
+
+def columnar_response(table) -> Response:
+    """
+    以列式二进制返回数值表格，前端 fetch().arrayBuffer() 后按列构建 TypedArray，
+    解码见 front_end/src/utils/columnar.ts
+
+    Args:
+        table: ColumnarTable，或已打包的负载（bytes / memoryview）
+    """
+    if isinstance(table, ColumnarTable):
+        # 接收得到的表格直接使用原始负载，不重新打包
+        table = table.buffer if table.buffer is not None else table.pack()
+    body = bytes(table)
+    return Response(body, mimetype=COLUMNAR_MIMETYPE)
+
+
+def encode_cursor(value: Any) -> str:
+    """把分页位置编码为不透明的 URL 安全字符串"""
+    return base64.urlsafe_b64encode(dumps(value)).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Any:
+    """解码 encode_cursor 生成的游标，格式错误时抛出 ValueError"""
+    padding = '=' * (-len(cursor) % 4)
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except (binascii.Error, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def page_args(default_limit: int = 100, max_limit: int = 1000, cursor_type: Optional[type] = None) -> Tuple[Any, int]:
+    """
+    从查询参数读取 cursor / limit
+
+    Args:
+        cursor_type: 游标解码后应有的类型，如 int；None 表示不检查
+
+    Returns:
+        (解码后的位置或 None, 限制后的条数)
+
+    Raises:
+        ValueError: 游标格式错误或类型不符，调用方应返回 400
+    """
+    cursor = request.args.get('cursor')
+    limit = request.args.get('limit', default_limit, type=int)
+    after = decode_cursor(cursor) if cursor else None
+    if after is not None and cursor_type is not None and type(after) is not cursor_type:
+        raise ValueError(f"Invalid cursor type: {type(after).__name__}")
+    return after, max(1, min(limit, max_limit))
+
+
+def paginate(fetch: Callable[[Any, int], List[Any]], key: Callable[[Any], Any], after: Any, limit: int) -> Dict[str, Any]:
+    """
+    游标分页
+
+    Args:
+        fetch: fetch(after, n) 返回位置 after 之后的至多 n 行，after 为 None 表示从头开始
+        key: 由行计算其位置（通常为主键）
+        after: 上一页最后一行的位置
+        limit: 每页行数
+
+    Returns:
+        {"list": 本页行, "next_cursor": 下一页游标，没有更多数据时为 None}
+    """
+    rows = fetch(after, limit + 1)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(key(rows[-1])) if has_more and rows else None
+    return {"list": rows, "next_cursor": next_cursor}
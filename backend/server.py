@@ -1,20 +1,68 @@
 import subprocess
 import os
 import signal
-from waitress import serve
+import sys
+import threading
+import time
+import urllib.request
+from dataclasses import dataclass, fields
+from typing import Optional
+
 from backend.app import app
+from backend.push import hub
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@dataclass
+class ServerConfig:
+    """后端服务配置，可由环境变量 BACKEND_<字段名大写> 覆盖"""
+
+    engine: str = "waitress"  # waitress / gunicorn
+    host: str = "127.0.0.1"
+    port: int = 5000
+
+    # waitress；gunicorn 仅 gthread 使用
+    threads: int = 8  # 工作线程数；每个打开的 SSE 页面占用一个
+    connection_limit: int = 100
+    channel_timeout: int = 120
 
-def start_gunicorn():
-    # 注意：一定要使用绝对路径导入 app
-    os.chdir(os.path.dirname(__file__))
+    # gunicorn
+    workers: int = 1
+    worker_class: str = "gthread"  # sync / gthread / gevent
+    worker_connections: int = 1000  # gevent 每个 worker 的并发连接数
+    backlog: int = 2048
 
+    @classmethod
+    def from_env(cls, prefix: str = "BACKEND_") -> "ServerConfig":
+        config = cls()
+        for field in fields(cls):
+            value = os.environ.get(prefix + field.name.upper())
+            if value is not None:
+                setattr(config, field.name, field.type(value))
+        return config
+
+    @property
+    def url(self) -> str:
+        host = "127.0.0.1" if self.host in ("0.0.0.0", "") else self.host
+        return f"http://{host}:{self.port}"
+
+
+def start_gunicorn(config: ServerConfig) -> subprocess.Popen:
     gunicorn_cmd = [
-        "gunicorn",
-        "-w", "1",
-        "-k", "gevent",
-        "-b", "127.0.0.1:5000",
-        "app:app"
+        sys.executable, "-m", "gunicorn",
+        "--chdir", PROJECT_ROOT,
+        "-w", str(config.workers),
+        "-k", config.worker_class,
+        "--worker-connections", str(config.worker_connections),
+        "--backlog", str(config.backlog),
+        "-b", f"{config.host}:{config.port}",
+        # 注意：一定要使用绝对路径导入 app
+        "backend.app:app",
     ]
+    if config.worker_class == "gthread":
+        # sync worker 收到 --threads > 1 时 gunicorn 会自动改用 gthread
+        gunicorn_cmd[-1:-1] = ["--threads", str(config.threads)]
     return subprocess.Popen(gunicorn_cmd, start_new_session=True)
 
 
@@ -32,12 +80,104 @@ def kill_gunicorn(proc: subprocess.Popen):
             print("Failed to kill gunicorn:", e)
 
 
+class BackendServer:
+    """
+    后端服务生命周期：按配置启动 waitress（后台线程）或 gunicorn（子进程），
+    通过 /api/health 判断就绪，stop() 负责清理
+    """
+
+    def __init__(self, config: Optional[ServerConfig] = None):
+        self.config = config or ServerConfig.from_env()
+        self.ready = threading.Event()
+        self._waitress = None
+        self._thread: Optional[threading.Thread] = None
+        self._process: Optional[subprocess.Popen] = None
+
+    @property
+    def url(self) -> str:
+        return self.config.url
+
+    def start(self):
+        # 同一进程内先前的 stop() 已关闭推送中心，重新启动时恢复
+        hub.reopen()
+        if self.config.engine == "gunicorn":
+            self._process = start_gunicorn(self.config)
+        elif self.config.engine == "waitress":
+            from waitress.server import create_server
+
+            self._waitress = create_server(
+                app,
+                host=self.config.host,
+                port=self.config.port,
+                threads=self.config.threads,
+                connection_limit=self.config.connection_limit,
+                channel_timeout=self.config.channel_timeout,
+                backlog=self.config.backlog,
+            )
+            self._thread = threading.Thread(target=self._run_waitress, daemon=True)
+            self._thread.start()
+        else:
+            raise ValueError(f"Unknown backend engine: {self.config.engine}")
+
+    def _run_waitress(self):
+        try:
+            self._waitress.run()
+        except Exception as e:
+            # stop() 关闭监听套接字后 run() 可能抛出异常
+            if self._waitress is not None:
+                print("Flask server crashed:", e)
+
+    def check_ready(self, timeout: float = 0.3) -> bool:
+        """探测一次健康检查接口，成功则标记为就绪"""
+        if self.ready.is_set():
+            return True
+        try:
+            with urllib.request.urlopen(f"{self.url}/api/health", timeout=timeout) as response:
+                if response.status == 200:
+                    self.ready.set()
+        except OSError:
+            pass
+        return self.ready.is_set()
+
+    def wait_ready(self, timeout: float = 10.0, interval: float = 0.05) -> bool:
+        """阻塞等待服务就绪"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.check_ready():
+                return True
+            if self._process is not None and self._process.poll() is not None:
+                return False  # gunicorn 启动失败
+            time.sleep(interval)
+        return False
+
+    def stop(self):
+        self.ready.clear()
+        # 先结束 SSE 长连接，否则 waitress 工作线程要等到 keepalive 超时才退出
+        hub.close()
+        if self._process is not None:
+            kill_gunicorn(self._process)
+            self._process = None
+        if self._waitress is not None:
+            server, self._waitress = self._waitress, None
+            # 先停工作线程，再关闭监听和触发器，避免仍在处理的请求写入已关闭的触发器
+            server.task_dispatcher.shutdown(timeout=5)
+            server.close()
+            if self._thread is not None:
+                self._thread.join(timeout=5)
+                self._thread = None
+
+
 def run_flask():
+    server = BackendServer()
+    server.start()
     try:
-        serve(app, host='0.0.0.0', port=5000)
-    except Exception as e:
-        print("Flask server crashed:", e)
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
 
 
 if __name__ == "__main__":
-    run_flask()
\ No newline at end of file
+    run_flask()
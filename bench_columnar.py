@@ -0,0 +1,52 @@
+# bench_columnar.py
+"""
+DATA_RESPONSE 负载编码对比：JSON 行字典 vs ColumnarTable 列式二进制。
+
+用法：python bench_columnar.py [--rows 1000000]
+"""
+import argparse
+import time
+from array import array
+
+from columnar import ColumnarTable, numpy
+from tcp_server import SocketMessage, MessageType
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    n = args.rows
+    if numpy is not None:
+        columns = {
+            'id': numpy.arange(n, dtype='<i8'),
+            'price': numpy.linspace(0, 1, n),
+            'volume': numpy.arange(n, dtype='<i4') % 1000,
+        }
+    else:
+        columns = {
+            'id': array('q', range(n)),
+            'price': array('d', (i / n for i in range(n))),
+            'volume': array('i', (i % 1000 for i in range(n))),
+        }
+    table = ColumnarTable(columns)
+    records = table.to_records()
+
+    print(f"rows: {n}  decoder: {'numpy' if numpy is not None else 'memoryview'}")
+    print(f"{'payload':<10}{'pack ms':>10}{'unpack ms':>11}{'size MiB':>10}")
+    for name, payload in (('json', records), ('columnar', table)):
+        message = SocketMessage(MessageType.DATA_RESPONSE, 1, payload)
+        frame, pack_time = timed(message.pack)
+        _, unpack_time = timed(lambda: SocketMessage.unpack(frame))
+        print(f"{name:<10}{pack_time * 1e3:>10.1f}{unpack_time * 1e3:>11.1f}{len(frame) / 2 ** 20:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+# bench_priority.py
+"""
+优先级通道基准：服务端持续向客户端推送大块 DATA_RESPONSE，
+客户端周期性发送 COMMAND，服务端回 COMMAND_ACK，统计命令往返的尾延迟。
+
+用法：python bench_priority.py [--commands 500] [--bulk-size 4194304] [--fifo]
+  --fifo  所有消息走同一条队列，作为对照组
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+
+from PySide6.QtCore import QCoreApplication, QTimer
+
+import tcp_server
+from tcp_server import TcpServer, MessageType
+from tcp_client import TcpClient
+
+HOST = '127.0.0.1'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--commands', type=int, default=500)
+    parser.add_argument('--interval', type=int, default=10, help='COMMAND 发送间隔（毫秒）')
+    parser.add_argument('--bulk-size', type=int, default=4 * 1024 * 1024)
+    parser.add_argument('--port', type=int, default=12395)
+    parser.add_argument('--fifo', action='store_true')
+    args = parser.parse_args()
+
+    app = QCoreApplication(sys.argv)
+    logging.getLogger().setLevel(logging.WARNING)
+    if args.fifo:
+        tcp_server.MESSAGE_PRIORITIES.clear()
+
+    server = TcpServer()
+    server.start(HOST, args.port)
+    client = TcpClient(auto_reconnect=False)
+
+    bulk = 'x' * args.bulk_size
+    sent_at = {}
+    latencies = []
+    bulk_bytes = [0]
+
+    def on_server_receive(sock, payload):
+        if isinstance(payload, dict) and 'cmd' in payload:
+            server.send_data(sock, payload, MessageType.COMMAND_ACK)
+
+    def on_client_receive(_, data: bytes):
+        if len(data) < 64:
+            payload = json.loads(data)
+            if isinstance(payload, dict) and payload.get('cmd') in sent_at:
+                latencies.append(time.perf_counter() - sent_at.pop(payload['cmd']))
+                if len(latencies) >= args.commands:
+                    app.quit()
+                return
+        bulk_bytes[0] += len(data)
+
+    def pump_bulk():
+        # 保持服务端大块数据队列非空，使链路始终饱和
+        for sock in server.clients:
+            if server.outbound[sock].pending() < 64:
+                server.send_data(sock, bulk, MessageType.DATA_RESPONSE)
+
+    command_id = [0]
+
+    def send_command():
+        command_id[0] += 1
+        sent_at[command_id[0]] = time.perf_counter()
+        client.send_data({'cmd': command_id[0]}, MessageType.COMMAND)
+
+    server.data_received.connect(on_server_receive)
+    client.raw_data_received.connect(on_client_receive)
+
+    bulk_timer = QTimer()
+    bulk_timer.timeout.connect(pump_bulk)
+    command_timer = QTimer()
+    command_timer.setInterval(args.interval)
+    command_timer.timeout.connect(send_command)
+
+    def on_connected():
+        bulk_timer.start(1)
+        command_timer.start()
+
+    client.connected.connect(on_connected)
+    client.connect_to_server(HOST, args.port)
+
+    start = time.perf_counter()
+    app.exec()
+    elapsed = time.perf_counter() - start
+    bulk_timer.stop()
+    command_timer.stop()
+    server.stop()
+
+    latencies.sort()
+    n = len(latencies)
+    print(f"mode: {'fifo' if args.fifo else 'priority'}  commands: {n}  bulk: {bulk_bytes[0] / elapsed / (1024 * 1024):.1f} MiB/s")
+    for label, q in (('p50', 0.5), ('p99', 0.99), ('p99.9', 0.999)):
+        print(f"{label:<6}{latencies[min(n - 1, int(n * q))] * 1e3:>10.2f} ms")
+    print(f"{'max':<6}{latencies[-1] * 1e3:>10.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+# bench_transport.py
+"""
+同机传输基准：回环 TCP / 本地套接字 / 本地套接字 + 共享内存。
+
+TcpServer 将收到的负载原样回发，基准客户端测量往返延迟与吞吐量。
+用法：python bench_transport.py [--rounds 2000] [--size 1048576] [--count 200]
+"""
+import argparse
+import logging
+import sys
+import time
+
+from PySide6.QtCore import QCoreApplication
+
+from tcp_server import TcpServer, SocketMessage, MessageType, FrameReader, OutboundQueue, SHM_RING_KEY, read_shared_payload
+from transport import (
+    TransportType, SharedRingBuffer, SharedDescriptor,
+    create_socket, connect_socket, disconnect_socket,
+)
+
+HOST = '127.0.0.1'
+SHM_THRESHOLD = 64 * 1024
+
+
+class EchoBench:
+    def __init__(self, app, transport: TransportType, port: int, shm_threshold=None):
+        self.app = app
+        self.shm_threshold = shm_threshold
+        self.server = TcpServer(transport=transport, shm_threshold=shm_threshold)
+        self.server.data_received.connect(self.server.send_data)
+        if not self.server.start(HOST, port):
+            raise RuntimeError(f"server failed to listen on {port}")
+
+        self.socket = create_socket(transport)
+        self.socket.readyRead.connect(self._on_ready_read)
+        self.reader = FrameReader()
+        self.outbound = OutboundQueue(self.socket)
+        self.received = 0
+        self.send_ring = None
+        self.recv_ring = None
+        self.sequence = 0
+
+        connect_socket(self.socket, transport, HOST, port)
+        self._wait(lambda: self.server.clients)
+        if shm_threshold is not None:
+            # 与 TcpClient 相同的协商：声明本端缓冲区，等待服务器回复其缓冲区
+            self.send_ring = SharedRingBuffer.create()
+            self.send({SHM_RING_KEY: self.send_ring.name}, MessageType.HANDSHAKE)
+            self._wait(lambda: self.recv_ring is not None)
+            self.outbound.use_shared_ring(self.send_ring, shm_threshold)
+
+    def _wait(self, cond, timeout=30.0):
+        deadline = time.perf_counter() + timeout
+        while not cond():
+            if time.perf_counter() > deadline:
+                raise TimeoutError("benchmark timed out")
+            self.app.processEvents()
+
+    def _on_ready_read(self):
+        for frame in self.reader.feed(bytes(self.socket.readAll())):
+            msg = SocketMessage.unpack(frame)
+            if msg.header.msg_type == MessageType.HANDSHAKE:
+                self.recv_ring = SharedRingBuffer.attach(msg.payload[SHM_RING_KEY])
+                continue
+            if isinstance(msg.payload, SharedDescriptor):
+                read_shared_payload(self.recv_ring, msg.payload)
+            self.received += 1
+
+    def send(self, payload, msg_type=MessageType.DATA_REQUEST):
+        self.sequence += 1
+        self.outbound.put(SocketMessage(msg_type, self.sequence, payload))
+
+    def latency(self, rounds: int):
+        samples = []
+        for _ in range(rounds):
+            expected = self.received + 1
+            start = time.perf_counter()
+            self.send('ping')
+            self._wait(lambda: self.received >= expected)
+            samples.append(time.perf_counter() - start)
+        samples.sort()
+        return samples[len(samples) // 2], samples[int(len(samples) * 0.99)]
+
+    def throughput(self, size: int, count: int, window: int = 8):
+        payload = 'x' * size
+        target = self.received + count
+        sent = 0
+        start = time.perf_counter()
+        while self.received < target:
+            while sent < count and sent - (self.received - (target - count)) < window:
+                self.send(payload)
+                sent += 1
+            self.app.processEvents()
+        elapsed = time.perf_counter() - start
+        # 往返两个方向的有效负载
+        return 2 * size * count / elapsed / (1024 * 1024)
+
+    def close(self):
+        disconnect_socket(self.socket)
+        self._wait(lambda: not self.server.clients)
+        if self.send_ring is not None:
+            self.send_ring.close()
+        if self.recv_ring is not None:
+            self.recv_ring.close()
+        self.server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, default=2000)
+    parser.add_argument('--size', type=int, default=1024 * 1024)
+    parser.add_argument('--count', type=int, default=200)
+    parser.add_argument('--port', type=int, default=12390)
+    args = parser.parse_args()
+
+    app = QCoreApplication(sys.argv)
+    # 关闭逐帧日志，避免日志开销掩盖传输差异
+    logging.getLogger().setLevel(logging.WARNING)
+
+    cases = [
+        ('tcp', TransportType.TCP, None),
+        ('local', TransportType.LOCAL, None),
+        ('local+shm', TransportType.LOCAL, SHM_THRESHOLD),
+    ]
+    print(f"{'transport':<12}{'p50 us':>10}{'p99 us':>10}{'MiB/s':>12}")
+    for i, (name, transport, shm_threshold) in enumerate(cases):
+        bench = EchoBench(app, transport, args.port + i, shm_threshold)
+        try:
+            p50, p99 = bench.latency(args.rounds)
+            mib_s = bench.throughput(args.size, args.count)
+        finally:
+            bench.close()
+        print(f"{name:<12}{p50 * 1e6:>10.1f}{p99 * 1e6:>10.1f}{mib_s:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
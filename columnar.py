@@ -0,0 +1,146 @@
+# columnar.py
+import json
+import struct
+import sys
+from array import array
+from typing import Any, Dict, List, Optional
+
+try:
+    import numpy
+except ImportError:  # 可选依赖，未安装时解码为 memoryview
+    numpy = None
+
+# 负载布局（小端）：
+#   4字节魔数 | 4字节 schema 长度 | schema JSON | 补齐到 8 字节 | 各列数据（每列补齐到 8 字节）
+# schema: {"rows": 行数, "columns": [{"name", "dtype", "offset"}], "meta": {...}}
+# dtype 为 种类+字节数，如 f8 / i4 / u1 / b1；offset 相对于列数据区起点
+MAGIC = b'PSCL'
+ALIGNMENT = 8
+
+# memoryview / array.array 格式字符 -> dtype 种类
+_FORMAT_KINDS = {
+    'b': 'i', 'h': 'i', 'i': 'i', 'l': 'i', 'q': 'i',
+    'B': 'u', 'H': 'u', 'I': 'u', 'L': 'u', 'Q': 'u',
+    'f': 'f', 'd': 'f', '?': 'b',
+}
+# dtype -> memoryview.cast 使用的格式字符（无 numpy 时解码用）
+_CAST_FORMATS = {
+    'i1': 'b', 'i2': 'h', 'i4': 'i', 'i8': 'q',
+    'u1': 'B', 'u2': 'H', 'u4': 'I', 'u8': 'Q',
+    'f4': 'f', 'f8': 'd', 'b1': '?',
+}
+
+
+def _align(n: int) -> int:
+    return n + (-n % ALIGNMENT)
+
+
+def _column_buffer(column):
+    """
+    取列的小端连续字节视图
+
+    Returns:
+        (字节 memoryview, dtype, 行数)
+    """
+    if numpy is not None and isinstance(column, numpy.ndarray):
+        column = numpy.ascontiguousarray(column)
+        if column.dtype.byteorder == '>' or (column.dtype.byteorder == '=' and sys.byteorder == 'big'):
+            column = column.astype(column.dtype.newbyteorder('<'))
+
+    view = memoryview(column)
+    fmt = view.format.lstrip('@=<')
+    kind = _FORMAT_KINDS.get(fmt)
+    if view.ndim != 1 or not view.c_contiguous or kind is None:
+        raise ValueError(f"Unsupported column buffer: format={view.format!r} ndim={view.ndim}")
+    if view.format.startswith('>') or (sys.byteorder == 'big' and not view.format.startswith('<')):
+        swapped = array(_CAST_FORMATS[f"{kind}{view.itemsize}"], view.tobytes())
+        swapped.byteswap()
+        view = memoryview(swapped)
+    return view.cast('B'), f"{kind}{view.itemsize}", len(view)
+
+
+class ColumnarTable:
+    """
+    列式数值表负载
+
+    发送时各列（numpy 数组、array.array 或其他一维缓冲区）按缓冲区协议直接拼接，
+    接收时用 numpy.frombuffer 在原始帧上零拷贝构建数组（无 numpy 时为 memoryview）。
+    """
+
+    def __init__(self, columns: Dict[str, Any], meta: Optional[Dict[str, Any]] = None):
+        self.columns = columns
+        self.meta = meta if meta is not None else {}
+        self.buffer = None  # unpack 得到的表格：列数据所在的原始负载，可直接转发
+
+    @property
+    def rows(self) -> int:
+        for column in self.columns.values():
+            return len(column)
+        return 0
+
+    def pack(self) -> bytes:
+        """打包为二进制负载"""
+        schema_columns = []
+        buffers = []
+        offset = 0
+        rows = None
+        for name, column in self.columns.items():
+            view, dtype, length = _column_buffer(column)
+            if rows is None:
+                rows = length
+            elif length != rows:
+                raise ValueError(f"Column {name!r} has {length} rows, expected {rows}")
+            schema_columns.append({"name": name, "dtype": dtype, "offset": offset})
+            buffers.append(view)
+            padding = -view.nbytes % ALIGNMENT
+            if padding:
+                buffers.append(b'\0' * padding)
+            offset += view.nbytes + padding
+
+        schema = json.dumps(
+            {"rows": rows or 0, "columns": schema_columns, "meta": self.meta}, separators=(',', ':')
+        ).encode('utf-8')
+        prefix = MAGIC + struct.pack('<I', len(schema)) + schema
+        prefix += b'\0' * (-len(prefix) % ALIGNMENT)
+        return b''.join([prefix, *buffers])
+
+    @classmethod
+    def unpack(cls, data) -> 'ColumnarTable':
+        """
+        从二进制负载解码，列数据直接引用 data，不复制
+
+        Args:
+            data: bytes 或 memoryview
+        """
+        view = memoryview(data)
+        if bytes(view[:4]) != MAGIC:
+            raise ValueError("Not a columnar payload")
+        schema_size = struct.unpack_from('<I', view, 4)[0]
+        schema = json.loads(bytes(view[8:8 + schema_size]).decode('utf-8'))
+        base = _align(8 + schema_size)
+        rows = schema["rows"]
+
+        columns = {}
+        for column in schema["columns"]:
+            start = base + column["offset"]
+            dtype = column["dtype"]
+            if numpy is not None:
+                columns[column["name"]] = numpy.frombuffer(view, dtype='<' + dtype, count=rows, offset=start)
+            else:
+                size = int(dtype[1:])
+                chunk = view[start:start + rows * size]
+                if sys.byteorder == 'big' and size > 1:
+                    swapped = array(_CAST_FORMATS[dtype], chunk.tobytes())
+                    swapped.byteswap()
+                    columns[column["name"]] = memoryview(swapped)
+                else:
+                    columns[column["name"]] = chunk.cast(_CAST_FORMATS[dtype])
+        table = cls(columns, schema.get("meta"))
+        table.buffer = view
+        return table
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """转换为行字典列表，供只接受 JSON 的接口使用"""
+        names = list(self.columns)
+        values = [column.tolist() for column in self.columns.values()]
+        return [dict(zip(names, row)) for row in zip(*values)]
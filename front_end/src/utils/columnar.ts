@@ -0,0 +1,56 @@
+// 解码后端 columnar.ColumnarTable 的二进制负载（/api/columnar/<id>），
+// 各列直接在 ArrayBuffer 上构建 TypedArray，不复制数据
+export type Column =
+  | Int8Array
+  | Int16Array
+  | Int32Array
+  | BigInt64Array
+  | Uint8Array
+  | Uint16Array
+  | Uint32Array
+  | BigUint64Array
+  | Float32Array
+  | Float64Array;
+
+export interface ColumnarTable {
+  rows: number;
+  columns: Record<string, Column>;
+  meta: Record<string, any>;
+}
+
+const ARRAY_TYPES: Record<string, any> = {
+  i1: Int8Array,
+  i2: Int16Array,
+  i4: Int32Array,
+  i8: BigInt64Array,
+  u1: Uint8Array,
+  u2: Uint16Array,
+  u4: Uint32Array,
+  u8: BigUint64Array,
+  f4: Float32Array,
+  f8: Float64Array,
+  b1: Uint8Array,
+};
+
+export function decodeColumnar(buffer: ArrayBuffer): ColumnarTable {
+  const magic = new TextDecoder().decode(new Uint8Array(buffer, 0, 4));
+  if (magic !== "PSCL") {
+    throw new Error("Not a columnar payload");
+  }
+  // 布局为小端；TypedArray 使用本机字节序，浏览器运行的平台均为小端
+  const schemaSize = new DataView(buffer).getUint32(4, true);
+  const schema = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 8, schemaSize)));
+  const base = Math.ceil((8 + schemaSize) / 8) * 8;
+
+  const columns: Record<string, Column> = {};
+  for (const column of schema.columns) {
+    const ArrayType = ARRAY_TYPES[column.dtype];
+    columns[column.name] = new ArrayType(buffer, base + column.offset, schema.rows);
+  }
+  return { rows: schema.rows, columns, meta: schema.meta };
+}
+
+export async function fetchColumnar(url: string): Promise<ColumnarTable> {
+  const response = await fetch(url);
+  return decodeColumnar(await response.arrayBuffer());
+}
@@ -11,8 +11,9 @@ from PySide6.QtWebEngineWidgets import QWebEngineView
 from PySide6.QtCore import QTimer, QUrl
 from PySide6.QtWebChannel import QWebChannel
 from bridge import Bridge
-import requests
-from backend.server import kill_gunicorn, run_flask, start_gunicorn
+from backend.push import bridge_tcp_server
+from backend.server import BackendServer, ServerConfig
+from tcp_server import TcpServer
 # from PySide6.QtWidgets import QSplashScreen
 
 
@@ -38,9 +39,10 @@ def get_dist_path(filename: str) -> str:
 
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, backend: BackendServer):
         super().__init__()
         self.timer = None
+        self.backend = backend
         self.setWindowTitle("PySide6 + React + Flask")
         self.resize(1024, 768)
 
@@ -64,15 +66,13 @@ class MainWindow(QMainWindow):
         self.view.page().setWebChannel(self.channel)
 
         # 加载开发时的URL
-        self.view.load(QUrl("http://localhost:5000"))
+        self.view.load(QUrl(self.backend.url))
 
     def check_server(self):
-        try:
-            requests.get("http://127.0.0.1:5000", timeout=0.3)
+        if self.backend.check_ready():
             self.timer.stop()
-            self.view.load(QUrl("http://127.0.0.1:5000"))
-        except requests.exceptions.RequestException:
-            pass  # 继续等待
+            self.view.load(QUrl(self.backend.url))
+        # 否则继续等待
 
     def send_message_to_frontend(self):
         num = randint(0,99999)
@@ -82,25 +82,30 @@ class MainWindow(QMainWindow):
         self.status_bar.showMessage(text)
 
     def closeEvent(self, event):
-        print("窗口正在关闭，清理 Gunicorn...")
-        # self.clean_gunicorn()
-        # kill_gunicorn(gunicorn_process)
+        print("窗口正在关闭，停止后端服务...")
+        self.backend.stop()
         event.accept()
 
 
 if __name__ == '__main__':
-    # 启动 gunicorn
-    # gunicorn_process = start_gunicorn()
-    # 启动 Flask 线程
-    threading.Thread(target=run_flask, daemon=True).start()
+    # 启动后端（waitress 线程或 gunicorn 子进程，由 BACKEND_* 环境变量配置）
+    backend = BackendServer(ServerConfig.from_env())
+    backend.start()
 
     # 启动 Qt 应用
     app = QApplication(sys.argv)
 
+    # TCP 服务：收到的数据经 /api/events 推送到页面；
+    # 推送中心是进程内对象，只有 waitress（同进程）模式下页面能收到
+    tcp_server = TcpServer()
+    if backend.config.engine == "waitress":
+        bridge_tcp_server(tcp_server)
+    tcp_server.start()
+
     # splash = QSplashScreen()
     # splash.show()
 
-    window = MainWindow()
+    window = MainWindow(backend)
 
     # 定时检测 Flask 是否启动完成
     window.timer = QTimer()
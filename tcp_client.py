@@ -1,7 +1,14 @@
+import json
 import logging
-from PySide6.QtNetwork import QTcpSocket
-from PySide6.QtCore import QObject, Signal, QByteArray, QTimer
+from typing import Optional
+from PySide6.QtCore import QObject, Signal, QTimer
 from async_message import AsyncMessageHandler
+from columnar import ColumnarTable
+from tcp_server import SocketMessage, MessageType, FrameReader, OutboundQueue, SHM_RING_KEY, read_shared_payload
+from transport import (
+    TransportType, SharedRingBuffer, SharedDescriptor,
+    create_socket, connect_socket, disconnect_socket, is_connected,
+)
 
 # 配置日志输出格式与级别
 logging.basicConfig(
@@ -15,17 +22,26 @@ class TcpClient(QObject):
     connected = Signal()
     disconnected = Signal()
     error_occurred = Signal(str)
-    raw_data_received = Signal(QTcpSocket, bytes)         # 原始数据
-    async_raw_data_received = Signal(QTcpSocket, bytes)   # 异步处理结果
+    raw_data_received = Signal(object, bytes)         # 原始数据
+    async_raw_data_received = Signal(object, bytes)   # 异步处理结果
+    table_received = Signal(object, object)           # ColumnarTable 负载，不经 raw_data_received 分发
 
-    def __init__(self, parent=None, host='127.0.0.1', port=12345, auto_reconnect=True, reconnect_interval=5000):
+    def __init__(self, parent=None, host='127.0.0.1', port=12345, auto_reconnect=True, reconnect_interval=5000,
+                 transport: TransportType = TransportType.TCP, shm_threshold: Optional[int] = None):
         super().__init__(parent)
         self.host: str = host
         self.port: int = port
-        # TCP Socket 初始化
-        self.socket = QTcpSocket()
-        self.buffer = QByteArray()
-        self.expected_size = None  # 预期接收的数据长度（从4字节头解析）
+        # Socket 初始化（QTcpSocket 或 QLocalSocket）
+        self.transport = transport
+        self.socket = create_socket(transport)
+        self.reader = FrameReader()
+        self.outbound = OutboundQueue(self.socket)  # 按消息类型分优先级发送
+        self.sequence = 0
+
+        # 共享内存（仅本地套接字有效）：连接后在握手中声明发送缓冲区，服务器回复其缓冲区后启用
+        self.shm_threshold = shm_threshold
+        self.send_ring = None
+        self.recv_ring = None
 
         # 自动重连设置
         self.auto_reconnect = auto_reconnect
@@ -37,7 +53,6 @@ class TcpClient(QObject):
         # 消息异步处理器
         self.handler = AsyncMessageHandler()
         self.handler.message_handled.connect(self._on_message_handled)
-        self.raw_data_received.connect(self.handler.handle_message)
 
         # Socket 信号绑定
         self.socket.readyRead.connect(self._on_ready_read)
@@ -63,8 +78,8 @@ class TcpClient(QObject):
         if port:
             self.port = port
         try:
-            self.socket.connectToHost(self.host, self.port)
-          
+            connect_socket(self.socket, self.transport, self.host, self.port)
+
         except Exception as e:
             pass
 
@@ -74,17 +89,19 @@ class TcpClient(QObject):
         try:
             if self.reconnect_timer.isActive():
                 self.reconnect_timer.stop()
-            self.socket.disconnectFromHost()
+            disconnect_socket(self.socket)
         except Exception as e:
             logging.error(f"Error during disconnect: {e}")
 
-    def send_data(self, data: bytes):
-        """向服务器发送数据，附带4字节长度前缀"""
-        logging.info(f"Client sending data: {data}")
-        if self.socket.state() == QTcpSocket.ConnectedState:
+    def send_data(self, data, msg_type: MessageType = MessageType.DATA_REQUEST):
+        """向服务器发送数据，封装为 SocketMessage；bytes 按 UTF-8 解码为字符串负载，ColumnarTable 以列式二进制发送，其余可 JSON 序列化的对象原样发送"""
+        if is_connected(self.socket):
             try:
-                length_prefix = len(data).to_bytes(4, 'big')
-                self.socket.write(QByteArray(length_prefix + data))
+                if isinstance(data, bytes):
+                    data = data.decode('utf-8')
+                self.sequence = (self.sequence + 1) % 0x100000000
+                logging.debug(f"Client sending {msg_type.name} #{self.sequence}")
+                self.outbound.put(SocketMessage(msg_type, self.sequence, data))
             except Exception as e:
                 logging.error(f"Send error: {e}")
         else:
@@ -95,27 +112,38 @@ class TcpClient(QObject):
         try:
             self.last_received_time.start()  # 每次有数据就重置超时计时器
 
-            self.buffer.append(self.socket.readAll())
-
-            while True:
-                if self.expected_size is None:
-                    if self.buffer.size() < 4:
-                        break  # 不足4字节头，等下次接收
-                    length_bytes = self.buffer.left(4)
-                    self.expected_size = int.from_bytes(length_bytes.data(), 'big')
-                    self.buffer.remove(0, 4)
-
-                if self.buffer.size() < self.expected_size:
-                    break  # 数据不足，继续等待
-
-                data = self.buffer.left(self.expected_size)
-                self.buffer.remove(0, self.expected_size)
-                self.expected_size = None
-
-                if data == b'__HEARTBEAT_ACK__':
-                    return  # 心跳应答不再分发
-
-                self.raw_data_received.emit(self.socket, bytes(data))
+            for frame in self.reader.feed(bytes(self.socket.readAll())):
+                message = SocketMessage.unpack(frame)
+                if not message:
+                    logging.warning("Failed to unpack message")
+                    continue
+
+                payload = message.payload
+                if isinstance(payload, SharedDescriptor):
+                    try:
+                        payload = read_shared_payload(self.recv_ring, payload)
+                    except Exception as e:
+                        logging.warning(f"Dropping shared memory frame: {e}")
+                        continue
+
+                if message.header.msg_type == MessageType.HANDSHAKE and isinstance(payload, dict) \
+                        and SHM_RING_KEY in payload:
+                    self._on_shm_handshake(payload[SHM_RING_KEY])
+                    continue
+                if payload == '__HEARTBEAT_ACK__':
+                    continue  # 心跳应答不再分发
+
+                if isinstance(payload, ColumnarTable):
+                    # 直接交出解码后的表格，列数据引用接收帧，不再重新打包
+                    self.table_received.emit(self.socket, payload)
+                    continue
+
+                if isinstance(payload, str):
+                    data = payload.encode('utf-8')
+                else:
+                    data = json.dumps(payload).encode('utf-8')
+                self.raw_data_received.emit(self.socket, data)
+                self.handler.handle_message(self.socket, data, message.header.msg_type.priority.value)
         except Exception as e:
             logging.error(f"Error in _on_ready_read: {e}")
 
@@ -134,6 +162,7 @@ class TcpClient(QObject):
             if self.reconnect_timer.isActive():
                 self.reconnect_timer.stop()
             self.handler.start()
+            self._announce_shared_ring()
             self.connected.emit()
             self.heartbeat_timer.start()
             self.last_received_time.start()
@@ -146,12 +175,48 @@ class TcpClient(QObject):
             logging.warning("Disconnected from server.")
             self.heartbeat_timer.stop()
             self.last_received_time.stop()
+            self.outbound.clear()
+            self.reader = FrameReader()
+            self._release_shared_rings()
             self.disconnected.emit()
             if self.auto_reconnect:
                 self.reconnect_timer.start()
         except Exception as e:
             logging.error(f"Error in _on_disconnected: {e}")
 
+    def _announce_shared_ring(self):
+        """本地套接字且开启共享内存时，创建发送缓冲区并在握手中声明其名称"""
+        if self.transport != TransportType.LOCAL or self.shm_threshold is None:
+            return
+        try:
+            self.send_ring = SharedRingBuffer.create()
+        except Exception as e:
+            logging.warning(f"Shared memory unavailable: {e}")
+            return
+        self.send_data({SHM_RING_KEY: self.send_ring.name}, MessageType.HANDSHAKE)
+
+    def _on_shm_handshake(self, ring_name):
+        """服务器接受共享内存并声明了其发送缓冲区：附加后启用本端共享内存发送"""
+        if self.send_ring is None or self.recv_ring is not None or not isinstance(ring_name, str):
+            logging.warning("Rejecting unexpected shared memory handshake")
+            return
+        try:
+            self.recv_ring = SharedRingBuffer.attach(ring_name)
+        except Exception as e:
+            logging.warning(f"Shared memory handshake failed: {e}")
+            return
+        self.outbound.use_shared_ring(self.send_ring, self.shm_threshold)
+
+    def _release_shared_rings(self):
+        """释放共享内存，重连后重新协商"""
+        self.outbound.use_shared_ring(None, None)
+        if self.send_ring is not None:
+            self.send_ring.close()
+            self.send_ring = None
+        if self.recv_ring is not None:
+            self.recv_ring.close()
+            self.recv_ring = None
+
     def _on_error(self, socket_error):
         """处理 socket 错误"""
         try:
@@ -176,7 +241,7 @@ class TcpClient(QObject):
         """发送心跳包"""
         try:
             logging.debug("Sending heartbeat...")
-            self.send_data(b'__HEARTBEAT__')
+            self.send_data('__HEARTBEAT__', MessageType.HEARTBEAT)
         except Exception as e:
             logging.error(f"Error in _send_heartbeat: {e}")
 
@@ -1,14 +1,21 @@
+import itertools
 import json
 import struct
 import time
 import logging
+from collections import deque
 from dataclasses import dataclass
 
-from PySide6.QtNetwork import QHostAddress, QTcpServer, QTcpSocket
-from PySide6.QtCore import QObject, Signal, QByteArray
+from PySide6.QtCore import QObject, Signal
 from enum import Enum, auto
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Callable, List, Optional, Tuple
 from async_message import AsyncMessageHandler
+from columnar import ColumnarTable
+from traffic_recorder import TrafficRecorder, RecordEvent
+from transport import (
+    TransportType, SharedRingBuffer, SharedDescriptor,
+    create_server, listen, is_connected, peer_name,
+)
 
 logging.getLogger().setLevel(logging.DEBUG)
 
@@ -31,6 +38,46 @@ class MessageType(Enum):
     STATUS_UPDATE = auto()  # 状态更新
     ERROR = auto()  # 错误
 
+    # 传输层
+    FRAGMENT = auto()  # 大帧分片，用于与高优先级消息交错发送
+
+    @property
+    def priority(self) -> 'MessagePriority':
+        """消息所属的优先级"""
+        return MESSAGE_PRIORITIES.get(self, MessagePriority.BULK)
+
+
+class MessagePriority(Enum):
+    """消息优先级，数值越小越优先"""
+    CONTROL = 0  # 系统/控制消息
+    STATUS = 1  # 状态消息
+    BULK = 2  # 数据消息
+
+
+MESSAGE_PRIORITIES = {
+    MessageType.HANDSHAKE: MessagePriority.CONTROL,
+    MessageType.HEARTBEAT: MessagePriority.CONTROL,
+    MessageType.DISCONNECT: MessagePriority.CONTROL,
+    MessageType.COMMAND: MessagePriority.CONTROL,
+    MessageType.COMMAND_ACK: MessagePriority.CONTROL,
+    MessageType.STATUS_UPDATE: MessagePriority.STATUS,
+    MessageType.ERROR: MessagePriority.STATUS,
+    MessageType.DATA_REQUEST: MessagePriority.BULK,
+    MessageType.DATA_RESPONSE: MessagePriority.BULK,
+}
+
+HEADER_FORMAT = '!4sHHIII'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+FRAGMENT_SIZE = 64 * 1024  # 超过该大小的帧拆分发送
+
+# 协议版本同时标识负载编码
+VERSION_JSON = 1  # JSON 负载
+VERSION_COLUMNAR = 2  # ColumnarTable 列式二进制负载
+VERSION_SHM = 3  # SharedDescriptor，实际负载在共享内存环形缓冲区中
+
+# 握手负载中声明共享内存环形缓冲区名称的键
+SHM_RING_KEY = 'shm_ring'
+
 
 @dataclass
 class MessageHeader:
@@ -40,7 +87,7 @@ class MessageHeader:
     sequence: int  # 序列号
     timestamp: int  # 时间戳
     magic: bytes = b'PSQT'  # 魔数，用于标识协议
-    version: int = 1  # 协议版本
+    version: int = VERSION_JSON  # 协议版本
     payload_size: int = 0  # 负载大小
 
 
@@ -54,7 +101,7 @@ class SocketMessage:
         Args:
             msg_type: 消息类型
             sequence: 序列号
-            payload: 消息负载，字典格式
+            payload: 消息负载，字典格式；数值表格可传 ColumnarTable，以列式二进制发送
         """
         self.header = MessageHeader(
             msg_type=msg_type,
@@ -63,20 +110,46 @@ class SocketMessage:
         )
         self.payload = payload if payload is not None else {}
 
-    def pack(self) -> bytes:
+    def encode_payload(self) -> Tuple[int, bytes]:
+        """
+        编码消息负载
+
+        Returns:
+            (协议版本, 负载字节)
+        """
+        if isinstance(self.payload, ColumnarTable):
+            return VERSION_COLUMNAR, self.payload.pack()
+        if isinstance(self.payload, SharedDescriptor):
+            return VERSION_SHM, self.payload.pack()
+        # 将负载转换为JSON字符串，然后编码为UTF-8字节
+        return VERSION_JSON, json.dumps(self.payload).encode('utf-8')
+
+    @staticmethod
+    def decode_payload(version: int, payload_bytes) -> Any:
+        """按协议版本解码负载"""
+        if version == VERSION_COLUMNAR:
+            # 列数据直接引用接收到的帧，不复制
+            return ColumnarTable.unpack(payload_bytes)
+        if version == VERSION_SHM:
+            return SharedDescriptor.unpack(payload_bytes)
+        return json.loads(bytes(payload_bytes).decode('utf-8'))
+
+    def pack(self, encoded: Optional[Tuple[int, bytes]] = None) -> bytes:
         """
         将消息打包为二进制数据
 
+        Args:
+            encoded: 已由 encode_payload 编码的 (版本, 负载字节)，避免重复编码
+
         Returns:
             打包后的字节数据
         """
-        # 将负载转换为JSON字符串，然后编码为UTF-8字节
-        payload_bytes = json.dumps(self.payload).encode('utf-8')
+        self.header.version, payload_bytes = encoded if encoded is not None else self.encode_payload()
         self.header.payload_size = len(payload_bytes)
 
         # 打包消息头
         header_bytes = struct.pack(
-            '!4sHHIII',
+            HEADER_FORMAT,
             self.header.magic,  # 4字节魔数
             self.header.version,  # 2字节版本号
             self.header.msg_type.value,  # 2字节消息类型
@@ -102,52 +175,243 @@ class SocketMessage:
         """
         try:
             # 解析消息头
-            header_size = struct.calcsize('!4sHHIII')
             data = bytes(data)
-            if len(data) < header_size:
+            if len(data) < HEADER_SIZE:
                 return None
 
             magic, version, msg_type_value, sequence, timestamp, payload_size = struct.unpack(
-                '!4sHHIII', data[:header_size]
+                HEADER_FORMAT, data[:HEADER_SIZE]
             )
             # 验证魔数
             if magic != b'PSQT':
                 return None
 
             # 解析消息负载
-            payload_bytes = data[header_size:header_size + payload_size]
+            payload_bytes = memoryview(data)[HEADER_SIZE:HEADER_SIZE + payload_size]
             if len(payload_bytes) != payload_size:
                 return None
 
-            payload = json.loads(payload_bytes.decode('utf-8'))
+            payload = SocketMessage.decode_payload(version, payload_bytes)
 
             # 创建消息对象
             msg = cls(MessageType(msg_type_value), sequence, payload)
             msg.header.timestamp = timestamp
+            msg.header.version = version
             return msg
 
         except Exception as e:
             print(f"消息解析错误: {e}")
             return None
 
-class TcpServer(QObject):
-    # 定义信号
-    client_connected = Signal(QTcpSocket)
-    client_disconnected = Signal(QTcpSocket)
-    data_received = Signal(QTcpSocket, object)            # 原始数据帧
-    async_data_received = Signal(QTcpSocket, object)      # 异步处理结果
+    @staticmethod
+    def fragment(frame: bytes, sequence: int, fragment_size: int = FRAGMENT_SIZE) -> List[bytes]:
+        """
+        将完整帧拆分为 FRAGMENT 帧
+
+        分片负载为 4字节完整帧长度 + 帧片段，接收端按序列号重组
+
+        Args:
+            frame: pack() 得到的完整帧
+            sequence: 原消息序列号
+            fragment_size: 每个分片携带的帧数据大小
+
+        Returns:
+            分片帧列表
+        """
+        timestamp = int(time.time())
+        total_size = len(frame)
+        fragments = []
+        for offset in range(0, total_size, fragment_size):
+            payload = struct.pack('!I', total_size) + frame[offset:offset + fragment_size]
+            header = struct.pack(
+                HEADER_FORMAT, b'PSQT', VERSION_JSON, MessageType.FRAGMENT.value, sequence, timestamp, len(payload)
+            )
+            fragments.append(header + payload)
+        return fragments
+
+
+def read_shared_payload(ring: Optional[SharedRingBuffer], descriptor: SharedDescriptor) -> Any:
+    """
+    从对端声明的环形缓冲区取回描述符指向的负载
+
+    Raises:
+        ValueError: 连接未协商共享内存，或描述符不合法
+    """
+    if ring is None:
+        raise ValueError("Shared memory descriptor on a connection without negotiated shared memory")
+    if descriptor.version not in (VERSION_JSON, VERSION_COLUMNAR):
+        raise ValueError(f"Invalid shared payload version {descriptor.version}")
+    return SocketMessage.decode_payload(descriptor.version, ring.read(descriptor.pos, descriptor.size))
+
+
+class FrameReader:
+    """接收缓冲：从字节流中拆出完整帧，并重组 FRAGMENT 分片"""
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.fragments = {}  # 序列号 -> 已收到的帧数据
 
-    def __init__(self, parent=None):
+    def feed(self, data: bytes) -> List[bytes]:
+        """
+        追加接收到的数据
+
+        Returns:
+            本次可完整解析的帧列表（分片已重组）
+        """
+        self.buffer += data
+        frames = []
+        while len(self.buffer) >= HEADER_SIZE:
+            magic, version, msg_type_value, sequence, timestamp, payload_size = struct.unpack_from(
+                HEADER_FORMAT, self.buffer
+            )
+            total_size = HEADER_SIZE + payload_size
+            if len(self.buffer) < total_size:
+                break  # 数据还不完整，等下次继续
+
+            frame = bytes(self.buffer[:total_size])
+            del self.buffer[:total_size]
+            if msg_type_value != MessageType.FRAGMENT.value:
+                frames.append(frame)
+                continue
+
+            expected_size = struct.unpack_from('!I', frame, HEADER_SIZE)[0]
+            partial = self.fragments.setdefault(sequence, bytearray())
+            partial += frame[HEADER_SIZE + 4:]
+            if len(partial) >= expected_size:
+                del self.fragments[sequence]
+                frames.append(bytes(partial))
+        return frames
+
+
+class OutboundQueue:
+    """
+    按优先级分道的发送队列
+
+    每个优先级一条队列，大帧拆成 FRAGMENT 分片入队。只在套接字待写数据低于水位时写入，
+    且总是先取最高优先级队列，控制消息最多排在一个分片之后，而不是整条大消息之后。
+    协商了共享内存后，达到阈值的负载写入环形缓冲区，帧中只携带描述符。
+    环形缓冲区在帧真正写出时才写入：各优先级交错发送，入队顺序不等于发送顺序，
+    而读端按收到描述符的顺序连续消费。
+    """
+
+    HIGH_WATERMARK = 256 * 1024
+
+    def __init__(self, socket, fragment_size: int = FRAGMENT_SIZE, high_watermark: int = HIGH_WATERMARK,
+                 on_frame: Optional[Callable[[bytes], None]] = None):
+        """
+        Args:
+            on_frame: 每条消息打包出完整帧（分片前）时回调，用于流量录制
+        """
+        self.socket = socket
+        self.fragment_size = fragment_size
+        self.high_watermark = high_watermark
+        self.on_frame = on_frame
+        self.lanes = {priority: deque() for priority in MessagePriority}
+        self.ring = None
+        self.shm_threshold = None
+        self.socket.bytesWritten.connect(lambda _: self.flush())
+
+    def use_shared_ring(self, ring: Optional[SharedRingBuffer], threshold: Optional[int]):
+        """启用（ring 为 None 时关闭）共享内存发送"""
+        self.ring = ring
+        self.shm_threshold = threshold
+
+    def put(self, message: SocketMessage):
+        """消息入队并尝试发送"""
+        encoded = message.encode_payload()
+        lane = self.lanes[message.header.msg_type.priority]
+        if self.ring is not None and len(encoded[1]) >= self.shm_threshold:
+            lane.append((message, encoded))  # 发送时再写入环形缓冲区
+        else:
+            self._enqueue(lane, message, encoded)
+        self.flush()
+
+    def _enqueue(self, lane: deque, message: SocketMessage, encoded: Tuple[int, bytes], front: bool = False):
+        """打包为帧（必要时分片）放入队尾，front 为 True 时放在队首"""
+        frame = message.pack(encoded)
+        if self.on_frame is not None:
+            self.on_frame(frame)
+        if len(frame) > self.fragment_size:
+            frames = SocketMessage.fragment(frame, message.header.sequence, self.fragment_size)
+        else:
+            frames = [frame]
+        if front:
+            lane.extendleft(reversed(frames))
+        else:
+            lane.extend(frames)
+
+    def _share(self, lane: deque, message: SocketMessage, encoded: Tuple[int, bytes]):
+        """写入环形缓冲区，描述符帧放到队首立即发送；缓冲区已满或已关闭时回退为内联发送"""
+        version, payload_bytes = encoded
+        pos = self.ring.write(payload_bytes) if self.ring is not None else None
+        if pos is not None:
+            encoded = (VERSION_SHM, SharedDescriptor(version, pos, len(payload_bytes)).pack())
+        self._enqueue(lane, message, encoded, front=True)
+
+    def flush(self):
+        """按优先级写出帧，直到达到水位或队列为空"""
+        if not is_connected(self.socket):
+            return
+        while self.socket.bytesToWrite() < self.high_watermark:
+            frame = self._next_frame()
+            if frame is None:
+                break
+            self.socket.write(frame)
+
+    def _next_frame(self) -> Optional[bytes]:
+        for priority in MessagePriority:
+            lane = self.lanes[priority]
+            if lane:
+                if isinstance(lane[0], tuple):
+                    self._share(lane, *lane.popleft())
+                return lane.popleft()
+        return None
+
+    def pending(self) -> int:
+        """尚未写出的帧数"""
+        return sum(len(lane) for lane in self.lanes.values())
+
+    def clear(self):
+        for lane in self.lanes.values():
+            lane.clear()
+
+class TcpServer(QObject):
+    # 定义信号（client 为 QTcpSocket 或 QLocalSocket）
+    client_connected = Signal(object)
+    client_disconnected = Signal(object)
+    data_received = Signal(object, object)            # 原始数据帧
+    async_data_received = Signal(object, object)      # 异步处理结果
+
+    def __init__(self, parent=None, transport: TransportType = TransportType.TCP, shm_threshold: Optional[int] = None,
+                 recorder: Optional[TrafficRecorder] = None):
+        """
+        Args:
+            transport: 传输方式，TCP 或本机 LOCAL（QLocalServer）
+            shm_threshold: 负载达到该字节数时经共享内存环形缓冲区发送，None 表示关闭
+            recorder: 流量录制器，记录收发的完整帧，None 表示不录制；stop() 时关闭
+        """
         super().__init__(parent)
 
-        # TCP 服务器实例
-        self.server = QTcpServer()
+        # 服务器实例
+        self.transport = transport
+        self.server = create_server(transport)
         self.server.newConnection.connect(self._on_new_connection)
 
         # 客户端管理
         self.clients = []
-        self.buffers = {}          # 每个 client 的接收缓存
-        self.expected_sizes = {}   # 每个 client 当前预期数据长度
+        self.readers = {}          # 每个 client 的接收缓存（FrameReader）
+        self.outbound = {}         # 每个 client 的优先级发送队列
+        self.sequence = 0
+
+        # 流量录制
+        self.recorder = recorder
+        self.connection_ids = {}   # 每个 client 的连接id（录制用）
+        self._connection_counter = itertools.count(1)
+
+        # 共享内存（仅同机有效）
+        self.shm_threshold = shm_threshold
+        self.send_rings = {}       # 每个 client 的发送环形缓冲区
+        self.recv_rings = {}       # 每个 client 握手时声明的接收环形缓冲区
 
         # 异步消息处理器
         self.handler = AsyncMessageHandler()
@@ -156,13 +420,27 @@ class TcpServer(QObject):
 
     def start(self, host='127.0.0.1', port=12345) -> bool:
         """启动服务器监听"""
-        if self.server.listen(QHostAddress(host), port):
-            logging.info(f"Server listening on {host}:{port}")
+        if listen(self.server, self.transport, host, port):
+            logging.info(f"Server listening on {host}:{port} ({self.transport.value})")
             return True
         else:
             logging.error(f"Failed to start server: {self.server.errorString()}")
             return False
 
+    def stop(self):
+        """停止监听并释放所有客户端资源（发送队列、共享内存环形缓冲区）"""
+        self.server.close()
+        self.handler.stop()
+        for client in list(self.clients):
+            self.clients.remove(client)
+            self._release_client(client)
+            self.client_disconnected.emit(client)
+            # abort 触发的 disconnected 只剩 deleteLater，资源已在上面释放
+            client.abort()
+        if self.recorder is not None:
+            self.recorder.close()
+        logging.info("Server stopped")
+
     def _on_new_connection(self):
         """处理新连接"""
         while self.server.hasPendingConnections():
@@ -174,84 +452,124 @@ class TcpServer(QObject):
                 client.disconnected.connect(lambda c=client: self._on_disconnected(c))
 
                 self.clients.append(client)
-                self.buffers[client] = QByteArray()
-                self.expected_sizes[client] = None
+                self.readers[client] = FrameReader()
+                self.connection_ids[client] = next(self._connection_counter)
+                self.outbound[client] = OutboundQueue(client, on_frame=self._recorder_hook(client))
+
+                if self.recorder is not None:
+                    self.recorder.record(self.connection_ids[client], RecordEvent.CONNECT)
 
                 self.client_connected.emit(client)
-                logging.info(f"New client connected: {client.peerAddress().toString()}:{client.peerPort()}")
+                logging.info(f"New client connected: {peer_name(client)}")
             except Exception as e:
                 logging.error(f"Error accepting new connection: {e}")
 
-    def _on_ready_read(self, client: QTcpSocket):
+    def _recorder_hook(self, client):
+        """发送队列的录制回调：记录实际发出的完整帧（共享内存负载记录为描述符帧）"""
+        if self.recorder is None:
+            return None
+        connection_id = self.connection_ids[client]
+        return lambda frame: self.recorder.record(connection_id, RecordEvent.OUTBOUND, frame)
+
+    def _on_ready_read(self, client):
         try:
-            buffer = self.buffers.get(client)
-            if buffer is None:
+            reader = self.readers.get(client)
+            if reader is None:
                 logging.warning("Unknown client in readyRead")
                 return
 
-            buffer.append(client.readAll())
-
             # 处理所有可完整解析的消息
-            while True:
-                header_size = struct.calcsize('!4sHHIII')
-                if buffer.size() < header_size:
-                    break  # 等待更多数据
-
-                # 先尝试读取 header
-                header_bytes = buffer.left(header_size)
-                try:
-                    magic, version, msg_type_value, sequence, timestamp, payload_size = struct.unpack(
-                        '!4sHHIII', bytes(header_bytes)
-                    )
-                except Exception as e:
-                    logging.error(f"Header unpack failed: {e}")
-                    break
-
-                # 检查是否收到了完整 payload
-                total_size = header_size + payload_size
-                if buffer.size() < total_size:
-                    break  # 数据还不完整，等下次继续
-
-                # 拿到完整一帧，解析消息
-                message_bytes = buffer.left(total_size)
-                buffer.remove(0, total_size)
+            for message_bytes in reader.feed(bytes(client.readAll())):
+                if self.recorder is not None:
+                    self.recorder.record(self.connection_ids[client], RecordEvent.INBOUND, message_bytes)
 
                 unpacked_msg = SocketMessage.unpack(message_bytes)
                 if not unpacked_msg:
                     logging.warning("Failed to unpack message")
                     continue
 
-                logging.info(f"unpacked_msg.payload: {unpacked_msg.payload}")
+                # 共享内存描述符：从对端声明的环形缓冲区取回实际负载；单帧出错不影响同批其他帧
+                if isinstance(unpacked_msg.payload, SharedDescriptor):
+                    try:
+                        unpacked_msg.payload = read_shared_payload(self.recv_rings.get(client), unpacked_msg.payload)
+                    except Exception as e:
+                        logging.warning(f"Dropping shared memory frame from {peer_name(client)}: {e}")
+                        continue
+
+                msg_type = unpacked_msg.header.msg_type
+                if msg_type == MessageType.HANDSHAKE and isinstance(unpacked_msg.payload, dict) \
+                        and SHM_RING_KEY in unpacked_msg.payload:
+                    self._on_shm_handshake(client, unpacked_msg.payload[SHM_RING_KEY])
+                    continue
+                logging.debug(f"Received {msg_type.name} #{unpacked_msg.header.sequence} from {peer_name(client)}")
 
                 # 心跳处理
                 if unpacked_msg.payload == '__HEARTBEAT__':
-                    logging.debug(f"Heartbeat from {client.peerAddress().toString()}")
-                    self.send_data(client, '__HEARTBEAT_ACK__')
+                    logging.debug(f"Heartbeat from {peer_name(client)}")
+                    self.send_data(client, '__HEARTBEAT_ACK__', MessageType.HEARTBEAT)
                     continue
 
                 self.data_received.emit(client, unpacked_msg.payload)
-                self.handler.handle_message(client, unpacked_msg.payload)
+                self.handler.handle_message(client, unpacked_msg.payload, msg_type.priority.value)
 
         except Exception as e:
             logging.error(f"Error reading from client: {e}")
 
-    def _on_disconnected(self, client: QTcpSocket):
+    def _on_shm_handshake(self, client, ring_name):
+        """
+        客户端声明了共享内存环形缓冲区
+
+        仅本地套接字且开启共享内存时接受：附加客户端的缓冲区，创建本端发送缓冲区并回复其名称；
+        每个连接只接受一次声明
+        """
+        if self.transport != TransportType.LOCAL or self.shm_threshold is None:
+            logging.debug(f"Ignoring shared memory handshake from {peer_name(client)}")
+            return
+        if client in self.recv_rings or not isinstance(ring_name, str):
+            logging.warning(f"Rejecting shared memory handshake from {peer_name(client)}")
+            return
+        try:
+            self.recv_rings[client] = SharedRingBuffer.attach(ring_name)
+            send_ring = SharedRingBuffer.create()
+        except Exception as e:
+            logging.warning(f"Shared memory handshake with {peer_name(client)} failed: {e}")
+            return
+        self.send_rings[client] = send_ring
+        self.send_data(client, {SHM_RING_KEY: send_ring.name}, MessageType.HANDSHAKE)
+        self.outbound[client].use_shared_ring(send_ring, self.shm_threshold)
+
+    def _on_disconnected(self, client):
         """客户端断开连接处理"""
         try:
-            logging.info(f"Client disconnected: {client.peerAddress().toString()}:{client.peerPort()}")
+            logging.info(f"Client disconnected: {peer_name(client)}")
             if client in self.clients:
                 self.clients.remove(client)
                 self.client_disconnected.emit(client)
-
-            # 清理资源
-            self.buffers.pop(client, None)
-            self.expected_sizes.pop(client, None)
+            self._release_client(client)
             client.deleteLater()
 
         except Exception as e:
             logging.error(f"Error during disconnection cleanup: {e}")
 
-    def _on_async_message_handled(self, client: QTcpSocket, data: bytes):
+    def _release_client(self, client):
+        """清理单个客户端的资源"""
+        connection_id = self.connection_ids.pop(client, None)
+        if self.recorder is not None and connection_id is not None:
+            self.recorder.record(connection_id, RecordEvent.DISCONNECT)
+            # 连接结束时落盘，进程异常退出最多丢失仍在连接中的记录
+            self.recorder.flush()
+        self.readers.pop(client, None)
+        outbound = self.outbound.pop(client, None)
+        if outbound is not None:
+            outbound.clear()
+        send_ring = self.send_rings.pop(client, None)
+        if send_ring is not None:
+            send_ring.close()
+        recv_ring = self.recv_rings.pop(client, None)
+        if recv_ring is not None:
+            recv_ring.close()
+
+    def _on_async_message_handled(self, client, data: bytes):
         """异步处理器结果回调"""
         try:
             # logging.debug(f"[AsyncHandler] {data}")
@@ -259,22 +577,18 @@ class TcpServer(QObject):
         except Exception as e:
             logging.error(f"Error in async result handling: {e}")
 
-    def send_data(self, client: QTcpSocket, data):
-        """向指定客户端发送数据，附加4字节长度头"""
-        if client in self.clients and client.state() == QTcpSocket.ConnectedState:
+    def send_data(self, client, data, msg_type: MessageType = MessageType.STATUS_UPDATE):
+        """向指定客户端发送数据，按消息类型进入对应优先级队列"""
+        if client in self.clients and is_connected(client):
             try:
-                # length_prefix = len(data).to_bytes(4, 'big')
-                # client.write(QByteArray(length_prefix + data))
-                messages = SocketMessage(
-                    msg_type=MessageType.STATUS_UPDATE,
-                    sequence=42,
+                self.sequence = (self.sequence + 1) % 0x100000000
+                message = SocketMessage(
+                    msg_type=msg_type,
+                    sequence=self.sequence,
                     payload=data
                 )
-
-                d = messages.pack()
-                logging.info(f"Client sending data: {d} to {client.peerAddress().toString()}:{client.peerPort()}")
-                client.write(d)
-                # logging.debug(f"Sent {len(data)} bytes to {client.peerAddress().toString()}:{client.peerPort()}")
+                logging.debug(f"Sending {msg_type.name} #{self.sequence} to {peer_name(client)}")
+                self.outbound[client].put(message)
             except Exception as e:
                 logging.error(f"Send error: {e}")
         else:
@@ -0,0 +1,119 @@
+# traffic_recorder.py
+import glob
+import mmap
+import os
+import struct
+import time
+import logging
+from enum import Enum
+from typing import Iterator, List, Tuple
+
+# 文件头魔数
+FILE_MAGIC = b'PSQTCAP1'
+# 记录头：8字节时间戳(ns) + 4字节连接id + 1字节事件 + 4字节数据长度（小端）
+RECORD_FORMAT = '<QIBI'
+RECORD_HEADER_SIZE = struct.calcsize(RECORD_FORMAT)
+
+
+class RecordEvent(Enum):
+    """记录事件类型"""
+    INBOUND = 0  # 收到的完整帧
+    OUTBOUND = 1  # 发出的完整帧
+    CONNECT = 2  # 客户端连接
+    DISCONNECT = 3  # 客户端断开
+
+
+def capture_files(path: str) -> List[str]:
+    """按顺序列出某个录制路径轮转出的全部文件"""
+    stem, suffix = os.path.splitext(path)
+    return sorted(glob.glob(f"{glob.escape(stem)}.[0-9][0-9][0-9][0-9]{suffix}"))
+
+
+def iter_records(path: str) -> Iterator[Tuple[int, int, RecordEvent, memoryview]]:
+    """
+    以内存映射方式顺序读取录制文件
+
+    Args:
+        path: 单个录制文件路径
+
+    Returns:
+        (时间戳ns, 连接id, 事件, 帧数据) 迭代器；末尾不完整的记录被忽略。
+        帧数据是映射上的 memoryview，不复制；需要在迭代结束后保留时用 bytes() 复制
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size <= len(FILE_MAGIC):
+            return
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mm)
+        try:
+            if view[:len(FILE_MAGIC)] != FILE_MAGIC:
+                raise ValueError(f"Not a traffic capture: {path}")
+            pos = len(FILE_MAGIC)
+            size = len(mm)
+            while pos + RECORD_HEADER_SIZE <= size:
+                timestamp, conn_id, event, length = struct.unpack_from(RECORD_FORMAT, mm, pos)
+                pos += RECORD_HEADER_SIZE
+                if pos + length > size:
+                    break
+                yield timestamp, conn_id, RecordEvent(event), view[pos:pos + length]
+                pos += length
+        finally:
+            view.release()
+            try:
+                mm.close()
+            except BufferError:
+                pass  # 调用方仍持有帧数据，映射在其释放后由垃圾回收关闭
+
+
+class TrafficRecorder:
+    """
+    流量录制器：把帧追加写入紧凑的二进制日志，供 traffic_replay 回放。
+
+    使用大缓冲区顺序写，单个文件超过 max_bytes 后轮转为下一个编号文件，
+    例如 path='capture.psqtcap' 依次写入 capture.0001.psqtcap、capture.0002.psqtcap ...
+    """
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024, buffer_size: int = 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.buffer_size = buffer_size
+        stem, _ = os.path.splitext(path)
+        existing = capture_files(path)
+        # 续写时从已有的最大编号之后开始
+        self._index = int(existing[-1][len(stem) + 1:len(stem) + 5]) if existing else 0
+        self._file = None
+        self._written = 0
+        self._rotate()
+
+    def _rotate(self):
+        if self._file is not None:
+            self._file.close()
+        self._index += 1
+        stem, suffix = os.path.splitext(self.path)
+        filename = f"{stem}.{self._index:04d}{suffix}"
+        self._file = open(filename, 'ab', buffering=self.buffer_size)
+        self._file.write(FILE_MAGIC)
+        self._written = len(FILE_MAGIC)
+        logging.info(f"Traffic capture writing to {filename}")
+
+    def record(self, conn_id: int, event: RecordEvent, data: bytes = b''):
+        """追加一条记录"""
+        if self._file is None:
+            return
+        try:
+            if self._written >= self.max_bytes:
+                self._rotate()
+            self._file.write(struct.pack(RECORD_FORMAT, time.time_ns(), conn_id, event.value, len(data)))
+            self._file.write(data)
+            self._written += RECORD_HEADER_SIZE + len(data)
+        except Exception as e:
+            logging.error(f"Traffic capture error: {e}")
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
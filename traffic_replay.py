@@ -0,0 +1,169 @@
+# traffic_replay.py
+"""
+流量回放：内存映射读取 TrafficRecorder 录制的文件，把客户端发来的帧重新注入 TcpServer。
+
+用法：
+  python traffic_replay.py capture.psqtcap --port 12345            原速回放到已运行的服务端
+  python traffic_replay.py capture.psqtcap --speed 4               4 倍速
+  python traffic_replay.py capture.psqtcap --speed 0 --serve       最快速度，进程内启动 TcpServer 统计处理管线吞吐
+  python traffic_replay.py capture.psqtcap --decode-only           只测 FrameReader / SocketMessage.unpack 解码路径
+
+注意：服务端开启共享内存模式时录制的帧只包含描述符，负载无法回放。
+"""
+import argparse
+import logging
+import sys
+import time
+
+from PySide6.QtCore import QCoreApplication
+
+from tcp_server import TcpServer, SocketMessage, FrameReader
+from traffic_recorder import RecordEvent, capture_files, iter_records
+from transport import TransportType, create_socket, connect_socket, disconnect_socket
+
+
+def load_records(path: str):
+    """依次读取轮转出的全部录制文件；path 本身是单个文件时直接读取"""
+    for filename in capture_files(path) or [path]:
+        yield from iter_records(filename)
+
+
+def decode_only(path: str):
+    """离线解码基准：不经过网络，直接把收到的帧送入 FrameReader 并解析"""
+    reader = FrameReader()
+    frames = 0
+    total_bytes = 0
+    start = time.perf_counter()
+    for _, _, event, data in load_records(path):
+        if event != RecordEvent.INBOUND:
+            continue
+        for frame in reader.feed(data):
+            SocketMessage.unpack(frame)
+            frames += 1
+        total_bytes += len(data)
+    elapsed = time.perf_counter() - start
+    print(f"decoded {frames} frames, {total_bytes / (1024 * 1024):.1f} MiB in {elapsed:.3f}s: "
+          f"{frames / elapsed:.0f} frames/s, {total_bytes / elapsed / (1024 * 1024):.1f} MiB/s")
+
+
+class Replayer:
+    def __init__(self, app, host: str, port: int, transport: TransportType):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.transport = transport
+        self.sockets = {}  # 录制中的连接id -> 回放套接字
+
+    def _socket_for(self, conn_id: int):
+        sock = self.sockets.get(conn_id)
+        if sock is None:
+            # 录制开始时连接已存在，首次出现时补建连接
+            sock = create_socket(self.transport)
+            connect_socket(sock, self.transport, self.host, self.port)
+            if not sock.waitForConnected(3000):
+                raise ConnectionError(f"connection {conn_id} failed: {sock.errorString()}")
+            self.sockets[conn_id] = sock
+        return sock
+
+    def _wait_until(self, due: float):
+        while True:
+            remaining = due - time.perf_counter()
+            if remaining <= 0:
+                return
+            self.app.processEvents()
+            if remaining > 0.002:
+                time.sleep(0.001)
+
+    def run(self, path: str, speed: float) -> int:
+        """
+        回放录制文件
+
+        Args:
+            path: 录制路径
+            speed: 回放倍速，0 表示不等待、尽快发送
+
+        Returns:
+            注入的帧数
+        """
+        frames = 0
+        first_timestamp = None
+        start = time.perf_counter()
+        for timestamp, conn_id, event, data in load_records(path):
+            if event == RecordEvent.OUTBOUND:
+                continue  # 服务端发出的帧由被测服务端自己产生
+            if first_timestamp is None:
+                first_timestamp = timestamp
+            if speed > 0:
+                self._wait_until(start + (timestamp - first_timestamp) / 1e9 / speed)
+
+            if event == RecordEvent.CONNECT:
+                self._socket_for(conn_id)
+            elif event == RecordEvent.DISCONNECT:
+                sock = self.sockets.pop(conn_id, None)
+                if sock is not None:
+                    self._drain(sock)
+                    disconnect_socket(sock)
+            else:
+                self._socket_for(conn_id).write(data)
+                frames += 1
+                if speed == 0:
+                    self.app.processEvents()
+
+        for sock in self.sockets.values():
+            self._drain(sock)
+        return frames
+
+    def _drain(self, sock):
+        while sock.bytesToWrite() > 0:
+            self.app.processEvents()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('path', help='录制路径（TrafficRecorder 的 path 或单个录制文件）')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=12345)
+    parser.add_argument('--transport', choices=[t.value for t in TransportType], default=TransportType.TCP.value)
+    parser.add_argument('--speed', type=float, default=1.0, help='回放倍速，0 表示最快')
+    parser.add_argument('--serve', action='store_true', help='进程内启动 TcpServer 作为回放目标')
+    parser.add_argument('--decode-only', action='store_true', help='只测解码路径，不建立连接')
+    args = parser.parse_args()
+
+    if args.decode_only:
+        decode_only(args.path)
+        return
+
+    app = QCoreApplication(sys.argv)
+    logging.getLogger().setLevel(logging.WARNING)
+    transport = TransportType(args.transport)
+
+    handled = [0, 0.0]  # 已处理消息数, 最后一次处理时间
+    if args.serve:
+        server = TcpServer(transport=transport)
+        if not server.start(args.host, args.port):
+            sys.exit(1)
+
+        def on_handled(*_):
+            handled[0] += 1
+            handled[1] = time.perf_counter()
+
+        server.async_data_received.connect(on_handled)
+
+    replayer = Replayer(app, args.host, args.port, transport)
+    start = time.perf_counter()
+    frames = replayer.run(args.path, args.speed)
+    elapsed = time.perf_counter() - start
+    print(f"replayed {frames} frames in {elapsed:.3f}s ({frames / elapsed:.0f} frames/s)")
+
+    if args.serve:
+        # 等待处理管线空闲 0.5s，视为全部处理完成
+        while time.perf_counter() - max(handled[1], start + elapsed) < 0.5:
+            app.processEvents()
+        if handled[0]:
+            pipeline = handled[1] - start
+            print(f"handled {handled[0]} messages in {pipeline:.3f}s ({handled[0] / pipeline:.0f} msg/s)")
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
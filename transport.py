@@ -0,0 +1,215 @@
+# transport.py
+import struct
+import logging
+from dataclasses import dataclass
+from enum import Enum
+from typing import Optional
+from multiprocessing import shared_memory
+
+from PySide6.QtNetwork import QAbstractSocket, QHostAddress, QTcpServer, QTcpSocket, QLocalServer, QLocalSocket
+
+
+class TransportType(Enum):
+    """传输方式枚举"""
+    TCP = 'tcp'  # 回环/网络 TCP
+    LOCAL = 'local'  # 本机 QLocalServer/QLocalSocket（Unix 域套接字 / Windows 命名管道）
+
+
+def local_server_name(host: str, port: int) -> str:
+    """根据 host/port 生成本地套接字名称，使两种传输方式共用同一套配置"""
+    return f"psqt_{host.replace('.', '_').replace(':', '_')}_{port}"
+
+
+def create_server(transport: TransportType):
+    """创建对应传输方式的服务器对象"""
+    if transport == TransportType.LOCAL:
+        return QLocalServer()
+    return QTcpServer()
+
+
+def listen(server, transport: TransportType, host: str, port: int) -> bool:
+    """开始监听"""
+    if transport == TransportType.LOCAL:
+        name = local_server_name(host, port)
+        if server.listen(name):
+            return True
+        if server.serverError() != QAbstractSocket.SocketError.AddressInUseError:
+            return False
+        # 名称已存在：有服务在监听则与 TCP 一样视为地址占用；
+        # 无人应答说明是上次异常退出残留的套接字文件，清理后重试
+        probe = QLocalSocket()
+        probe.connectToServer(name)
+        if probe.waitForConnected(200):
+            probe.disconnectFromServer()
+            return False
+        QLocalServer.removeServer(name)
+        return server.listen(name)
+    return server.listen(QHostAddress(host), port)
+
+
+def create_socket(transport: TransportType):
+    """创建对应传输方式的客户端套接字"""
+    if transport == TransportType.LOCAL:
+        return QLocalSocket()
+    return QTcpSocket()
+
+
+def connect_socket(socket, transport: TransportType, host: str, port: int):
+    """连接到服务器"""
+    if transport == TransportType.LOCAL:
+        socket.connectToServer(local_server_name(host, port))
+    else:
+        socket.connectToHost(host, port)
+
+
+def disconnect_socket(socket):
+    """断开连接"""
+    if isinstance(socket, QLocalSocket):
+        socket.disconnectFromServer()
+    else:
+        socket.disconnectFromHost()
+
+
+def is_connected(socket) -> bool:
+    """套接字是否处于已连接状态"""
+    if isinstance(socket, QLocalSocket):
+        return socket.state() == QLocalSocket.LocalSocketState.ConnectedState
+    return socket.state() == QTcpSocket.SocketState.ConnectedState
+
+
+def peer_name(socket) -> str:
+    """对端描述，用于日志"""
+    if isinstance(socket, QLocalSocket):
+        return f"local:{socket.fullServerName() or socket.socketDescriptor()}"
+    return f"{socket.peerAddress().toString()}:{socket.peerPort()}"
+
+
+# 共享内存段头部魔数，附加时校验，避免误用其他程序的内存段
+RING_MAGIC = b'PSQTRING'
+
+# 本进程创建的共享内存段名称；同进程内附加时不应从 resource_tracker 注销
+_owned_segments = set()
+
+
+class SharedRingBuffer:
+    """
+    共享内存环形缓冲区（单生产者/单消费者）。
+
+    大负载写入环形缓冲区，套接字上只传递 SharedDescriptor（位置与长度）。
+    缓冲区名称在握手时声明，接收端只从对端声明过的缓冲区读取。
+    写端只在本地维护写入位置；读端读取后把消费位置写回头部，写端据此计算剩余空间。
+    空间不足时 write 返回 None，调用方回退为内联发送。
+
+    头部布局（小端）：
+        [0:8]   消费位置 tail（读端写入）
+        [8:16]  数据区容量
+        [16:24] 魔数 RING_MAGIC
+    """
+
+    HEADER_SIZE = 64
+    DEFAULT_CAPACITY = 16 * 1024 * 1024
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self.shm = shm
+        self.owner = owner
+        self.name = shm.name
+        self.capacity = struct.unpack_from('<Q', shm.buf, 8)[0]
+        self._head = 0  # 写入位置（仅写端使用）
+
+    @classmethod
+    def create(cls, capacity: int = DEFAULT_CAPACITY) -> 'SharedRingBuffer':
+        """创建新的共享内存段（写端）"""
+        shm = shared_memory.SharedMemory(create=True, size=cls.HEADER_SIZE + capacity)
+        struct.pack_into('<QQ8s', shm.buf, 0, 0, capacity, RING_MAGIC)
+        _owned_segments.add(shm.name)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> 'SharedRingBuffer':
+        """按名称附加到对端声明的共享内存段（读端），头部不合法时抛出 ValueError"""
+        shm = shared_memory.SharedMemory(name=name)
+        if name not in _owned_segments:
+            try:
+                # 读端不拥有该内存段，避免 resource_tracker 在进程退出时将其删除
+                from multiprocessing import resource_tracker
+                resource_tracker.unregister(shm._name, 'shared_memory')
+            except Exception:
+                pass
+
+        if shm.size < cls.HEADER_SIZE:
+            shm.close()
+            raise ValueError(f"Shared memory {name} is too small")
+        tail, capacity, magic = struct.unpack_from('<QQ8s', shm.buf, 0)
+        if magic != RING_MAGIC or capacity == 0 or cls.HEADER_SIZE + capacity > shm.size:
+            shm.close()
+            raise ValueError(f"Shared memory {name} is not a ring buffer")
+        return cls(shm, owner=False)
+
+    def write(self, data: bytes) -> Optional[int]:
+        """写入数据，返回写入位置；空间不足返回 None"""
+        size = len(data)
+        tail = struct.unpack_from('<Q', self.shm.buf, 0)[0]
+        if size > self.capacity - (self._head - tail):
+            return None
+
+        offset = self._head % self.capacity
+        first = min(size, self.capacity - offset)
+        base = self.HEADER_SIZE
+        view = memoryview(data)
+        self.shm.buf[base + offset:base + offset + first] = view[:first]
+        if first < size:
+            self.shm.buf[base:base + size - first] = view[first:]
+
+        pos = self._head
+        self._head += size
+        return pos
+
+    def read(self, pos: int, size: int) -> bytes:
+        """
+        读取 [pos, pos + size) 的数据，并推进消费位置
+
+        只接受紧接在当前消费位置之后的区间，越界或乱序时抛出 ValueError，
+        保证消费位置不会越过尚未读取的数据
+        """
+        tail = struct.unpack_from('<Q', self.shm.buf, 0)[0]
+        if pos != tail or not 0 <= size <= self.capacity:
+            raise ValueError(f"Invalid shared range pos={pos} size={size} (tail={tail}, capacity={self.capacity})")
+
+        offset = pos % self.capacity
+        first = min(size, self.capacity - offset)
+        base = self.HEADER_SIZE
+        data = bytes(self.shm.buf[base + offset:base + offset + first])
+        if first < size:
+            data += bytes(self.shm.buf[base:base + size - first])
+        struct.pack_into('<Q', self.shm.buf, 0, pos + size)
+        return data
+
+    def close(self):
+        """释放映射；写端同时删除共享内存段"""
+        try:
+            self.shm.close()
+            if self.owner:
+                self.shm.unlink()
+                _owned_segments.discard(self.name)
+        except Exception as e:
+            logging.error(f"Error closing shared ring {self.name}: {e}")
+
+
+# 描述符布局：2字节实际负载版本 | 8字节位置 | 4字节长度
+SHARED_DESCRIPTOR_FORMAT = '!HQI'
+
+
+@dataclass
+class SharedDescriptor:
+    """共享内存描述符：实际负载位于对端握手时声明的环形缓冲区中"""
+
+    version: int  # 实际负载的编码版本
+    pos: int  # 在环形缓冲区中的位置
+    size: int  # 负载大小
+
+    def pack(self) -> bytes:
+        return struct.pack(SHARED_DESCRIPTOR_FORMAT, self.version, self.pos, self.size)
+
+    @classmethod
+    def unpack(cls, data) -> 'SharedDescriptor':
+        return cls(*struct.unpack(SHARED_DESCRIPTOR_FORMAT, bytes(data)))